@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'Git Module Installer',
-    'version': '18.0.1.4.2',
+    'version': '18.0.1.5.0',
     'category': 'Technical',
     'summary': 'Install Odoo modules directly from GitHub/GitLab repositories - supports tags and branches',
     'description': """
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Convert the legacy newline-joined `tags` text column to jsonb
+
+    Converting in place keeps the cached list and prevents the ORM from
+    renaming the old column to `tags_moved0` and leaving it behind.
+    """
+    if not version:
+        return
+    
+    cr.execute("""
+        SELECT data_type
+          FROM information_schema.columns
+         WHERE table_name = 'git_repository' AND column_name = 'tags'
+    """)
+    row = cr.fetchone()
+    if not row or row[0] == 'jsonb':
+        return
+    
+    _logger.info("Converting git_repository.tags from %s to jsonb", row[0])
+    cr.execute("""
+        ALTER TABLE git_repository
+        ALTER COLUMN tags TYPE jsonb
+        USING CASE
+            WHEN tags IS NULL OR tags = '' THEN NULL
+            ELSE to_jsonb(string_to_array(tags, E'\\n'))
+        END
+    """)
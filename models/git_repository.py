@@ -1,17 +1,195 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
+import shlex
 import subprocess
 import logging
 import shutil
 import pwd
+import functools
+import hashlib
+import collections
+import selectors
+import time
+import signal
+import threading
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from urllib.parse import urlparse
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
 
+try:
+    from dulwich.client import get_transport_and_path
+    from dulwich.config import StackedConfig
+except ImportError:
+    get_transport_and_path = None
+    StackedConfig = None
+
 _logger = logging.getLogger(__name__)
 
 
+# ls-remote results per URL: {url: (monotonic timestamp, refs)}
+_REFS_CACHE = {}
+_REFS_CACHE_TTL = 60
+
+# Seconds to wait for dulwich before falling back to the git command
+_DULWICH_TIMEOUT = 60
+
+# Options prepended to every git call. Protocol v2 lets the server filter
+# refs by prefix (ls-refs) instead of advertising every ref on connect.
+_GIT_OPTIONS = ['-c', 'protocol.version=2']
+
+# Ref prefixes requested from the server when listing with dulwich
+_REF_PREFIXES = [b'refs/heads/', b'refs/tags/']
+
+# Delay before signalling the server so the current response can be flushed
+_RESTART_DELAY = 1.5
+
+# Well-known hosts, resolved with a single dict lookup
+_REPOSITORY_HOSTS = {
+    'github.com': 'github',
+    'www.github.com': 'github',
+    'gitlab.com': 'gitlab',
+    'www.gitlab.com': 'gitlab',
+}
+
+
+def _send_restart_signal():
+    """Ask the parent Odoo process to reload (SIGHUP for graceful reload)"""
+    try:
+        os.kill(os.getppid(), signal.SIGHUP)
+    except Exception as e:
+        _logger.warning(f"Could not restart Odoo: {e}")
+
+
+def _schedule_restart():
+    """Send the restart signal after a short delay, from a background timer"""
+    timer = threading.Timer(_RESTART_DELAY, _send_restart_signal)
+    timer.daemon = True
+    timer.start()
+
+
+def _remove_tree(path):
+    """Recursively delete a directory, ignoring errors
+
+    Uses the external rm, which walks the tree in C, and falls back to
+    shutil.rmtree when it is unavailable or fails.
+    """
+    try:
+        subprocess.run(['rm', '-rf', '--', path], check=True, capture_output=True, timeout=120)
+    except Exception as e:
+        _logger.warning(f"rm -rf failed for {path}, falling back to shutil: {e}")
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _remove_tree_in_background(path):
+    """Delete a directory tree from a daemon thread"""
+    threading.Thread(target=_remove_tree, args=(path,), daemon=True).start()
+
+
+def _restore_tree(trash, path):
+    """Move a directory set aside for deletion back to its original path"""
+    try:
+        os.rename(trash, path)
+    except Exception as e:
+        _logger.warning(f"Could not restore {path} from {trash}: {e}")
+
+
+@functools.lru_cache(maxsize=1)
+def _git_executable():
+    """Resolve the git binary once per worker (None when git is not installed)"""
+    return shutil.which('git')
+
+
+def _dulwich_get_refs(url, timeout):
+    """List remote refs in-process with dulwich, giving up after timeout seconds
+
+    dulwich has no overall timeout of its own, so the call runs in a daemon
+    thread that is abandoned if it does not answer in time. The user's git
+    configuration is loaded so url.insteadOf and proxy settings apply.
+    Protocol v2 lets the server send only branches and tags.
+    """
+    outcome = {}
+    
+    def target():
+        try:
+            client, path = get_transport_and_path(url, config=StackedConfig.default())
+            try:
+                result = client.get_refs(path, protocol_version=2, ref_prefix=_REF_PREFIXES)
+            except TypeError:
+                # dulwich < 0.22 cannot filter refs on the server
+                result = client.get_refs(path)
+            # Newer dulwich versions wrap the refs dict in a result object
+            outcome['refs'] = getattr(result, 'refs', result)
+        except Exception as e:
+            outcome['error'] = e
+    
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"no answer within {timeout} seconds")
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['refs']
+
+
+def _refs_digest(refs):
+    """Digest of a sorted (ref_type, ref_name) listing, to detect changes"""
+    listing = '\n'.join(f"{ref_type}:{ref_name}" for ref_type, ref_name in refs)
+    return hashlib.sha1(listing.encode()).hexdigest()
+
+
+def _natural_sort_key(name):
+    """Version-aware sort key so that 'v10.0' sorts after 'v2.0'
+
+    Suffixes containing letters ('-rc1', 'b2') rank below the bare version,
+    so 'v1.0-rc1' sorts before 'v1.0' while 'v1.0.1' still sorts after it.
+    """
+    key = []
+    for part in re.findall(r'\d+|\D+', name.lstrip('v')):
+        if part.isdigit():
+            key.append((2, int(part)))
+        elif any(char.isalpha() for char in part):
+            key.append((0, part))
+        else:
+            key.append((1, part))
+    # End marker: above a pre-release suffix, below a further separator
+    key.append((1, ''))
+    return tuple(key)
+
+
+def _detect_repository_type(url):
+    """Detect the repository type from the URL host in a single parse"""
+    if not url:
+        return False
+    host = urlparse(url).netloc.lower()
+    repository_type = _REPOSITORY_HOSTS.get(host)
+    if repository_type:
+        return repository_type
+    # Self-hosted GitLab instances, default to GitHub otherwise
+    return 'gitlab' if 'gitlab' in host else 'github'
+
+
+@functools.lru_cache(maxsize=1)
+def _odoo_user():
+    """Name of the user running the Odoo process, looked up once per worker"""
+    try:
+        return pwd.getpwuid(os.getuid()).pw_name
+    except Exception as e:
+        _logger.warning(f"Could not determine Odoo user: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _get_user_ids(username):
+    """Return the (uid, gid) of a system user, cached per worker"""
+    pw = pwd.getpwnam(username)
+    return pw.pw_uid, pw.pw_gid
+
+
 class GitRepository(models.Model):
     _name = 'git.repository'
     _description = 'Git Repository Source'
@@ -22,7 +200,7 @@ class GitRepository(models.Model):
     repository_type = fields.Selection([
         ('github', 'GitHub'),
         ('gitlab', 'GitLab'),
-    ], string='Repository Type', compute='_compute_repository_type', store=True)
+    ], string='Repository Type', readonly=True)
     
     clone_path = fields.Char(
         string='Clone Path',
@@ -33,8 +211,9 @@ class GitRepository(models.Model):
     
     version_ids = fields.One2many('git.repository.version', 'repository_id', string='Available Versions')
     version_count = fields.Integer(string='Versions Count', compute='_compute_version_count')
-    tags = fields.Text(string='Available Tags/Branches (Legacy)', readonly=True, help='Cached list - for backward compatibility')
+    tags = fields.Json(string='Available Tags/Branches (Legacy)', readonly=True, help='Cached list - for backward compatibility')
     last_sync = fields.Datetime(string='Last Sync', readonly=True)
+    refs_digest = fields.Char(string='Refs Digest', readonly=True, help='Digest of the tags and branches listed at last sync, used to skip unchanged repositories')
     active = fields.Boolean(string='Active', default=True)
     state = fields.Selection([
         ('draft', 'Draft'),
@@ -51,19 +230,25 @@ class GitRepository(models.Model):
         for record in self:
             record.version_count = len(record.version_ids)
 
-    @api.depends('url')
-    def _compute_repository_type(self):
-        """Automatically detect repository type from URL"""
+    @api.onchange('url')
+    def _onchange_url(self):
+        """Preview detected repository type while editing"""
         for record in self:
-            if record.url:
-                if 'github.com' in record.url:
-                    record.repository_type = 'github'
-                elif 'gitlab.com' in record.url or 'gitlab' in record.url:
-                    record.repository_type = 'gitlab'
-                else:
-                    record.repository_type = 'github'  # default
-            else:
-                record.repository_type = False
+            record.repository_type = _detect_repository_type(record.url)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Automatically detect repository type from URL"""
+        for vals in vals_list:
+            if 'url' in vals:
+                vals['repository_type'] = _detect_repository_type(vals['url'])
+        return super().create(vals_list)
+
+    def write(self, vals):
+        """Keep repository type and sync state in sync when the URL changes"""
+        if 'url' in vals:
+            vals = dict(vals, repository_type=_detect_repository_type(vals['url']), refs_digest=False)
+        return super().write(vals)
 
     @api.constrains('url')
     def _check_url(self):
@@ -84,19 +269,22 @@ class GitRepository(models.Model):
 
     def _get_odoo_user(self):
         """Get the user running the Odoo process"""
-        try:
-            return pwd.getpwuid(os.getuid()).pw_name
-        except Exception as e:
-            _logger.warning(f"Could not determine Odoo user: {e}")
-            return None
+        return _odoo_user()
 
-    def _run_command(self, command, cwd=None):
-        """Execute shell command and return output"""
+    def _resolve_argv(self, argv):
+        """Return argv with the cached git executable and git options applied"""
+        if argv and argv[0] == 'git':
+            return [_git_executable() or 'git'] + _GIT_OPTIONS + list(argv[1:])
+        return list(argv)
+
+    def _run_command(self, argv, cwd=None):
+        """Execute command (list of arguments, no shell) and return output"""
+        argv = self._resolve_argv(argv)
         try:
-            _logger.info(f"Executing command: {command}")
+            _logger.info(f"Executing command: {shlex.join(argv)}")
             result = subprocess.run(
-                command,
-                shell=True,
+                argv,
+                shell=False,
                 cwd=cwd,
                 capture_output=True,
                 text=True,
@@ -104,7 +292,7 @@ class GitRepository(models.Model):
             )
             
             if result.returncode != 0:
-                error_msg = f"Command failed: {command}\nError: {result.stderr}"
+                error_msg = f"Command failed: {shlex.join(argv)}\nError: {result.stderr}"
                 _logger.error(error_msg)
                 raise UserError(error_msg)
             
@@ -115,96 +303,248 @@ class GitRepository(models.Model):
             _logger.exception("Error executing command")
             raise UserError(_(f'Error executing command: {str(e)}'))
 
-    def _get_git_refs(self):
-        """Fetch available tags and branches from git repository"""
-        self.ensure_one()
+    def _run_command_stream(self, argv, cwd=None, idle_timeout=120):
+        """Execute a long-running command, logging its output as it arrives
+
+        Output is not buffered in memory (only the last lines are kept for
+        error reporting) and the timeout applies to inactivity rather than
+        total duration, so slow but progressing clones are not killed.
+        """
+        argv = self._resolve_argv(argv)
+        _logger.info(f"Executing command: {shlex.join(argv)}")
+        try:
+            proc = subprocess.Popen(
+                argv,
+                cwd=cwd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+        except Exception as e:
+            _logger.exception("Error executing command")
+            raise UserError(_(f'Error executing command: {str(e)}'))
         
+        tail = collections.deque(maxlen=20)
+        pending = b''
+        fd = proc.stdout.fileno()
         try:
-            refs = []
-            
-            # Get tags
-            try:
-                command = f"git ls-remote --tags {self.url}"
-                output = self._run_command(command)
-                
-                if output:
-                    for line in output.split('\n'):
-                        if line and 'refs/tags/' in line:
-                            tag = line.split('refs/tags/')[-1]
-                            # Remove ^{} suffix for annotated tags
-                            if not tag.endswith('^{}'):
-                                refs.append(('tag', tag))
-            except Exception as e:
-                _logger.warning(f"Could not fetch tags: {e}")
+            with selectors.DefaultSelector() as selector:
+                selector.register(fd, selectors.EVENT_READ)
+                while True:
+                    if not selector.select(timeout=idle_timeout):
+                        proc.kill()
+                        proc.wait()
+                        raise UserError(_('Command timeout expired. No progress for %s seconds.') % idle_timeout)
+                    chunk = os.read(fd, 65536)
+                    if not chunk:
+                        break
+                    # git progress updates are separated by carriage returns
+                    *lines, pending = re.split(rb'[\r\n]', pending + chunk)
+                    for line in lines:
+                        if line:
+                            text = line.decode('utf-8', 'replace')
+                            tail.append(text)
+                            _logger.debug(text)
+            if pending:
+                tail.append(pending.decode('utf-8', 'replace'))
+            returncode = proc.wait()
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+        
+        if returncode != 0:
+            error_msg = f"Command failed: {shlex.join(argv)}\nError: " + '\n'.join(tail)
+            _logger.error(error_msg)
+            raise UserError(error_msg)
+
+    def _run_command_lines(self, argv, cwd=None):
+        """Execute command and yield its stdout line by line as it is produced
+
+        Avoids buffering the whole output in memory for commands with large
+        outputs. Raises UserError once the output is exhausted if the command
+        failed.
+        """
+        argv = self._resolve_argv(argv)
+        _logger.info(f"Executing command: {shlex.join(argv)}")
+        # stderr goes to a temporary file: a pipe only read after stdout EOF
+        # would block git once it writes more than a pipe buffer of stderr
+        stderr_file = tempfile.TemporaryFile()
+        try:
+            proc = subprocess.Popen(
+                argv,
+                cwd=cwd,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                text=True,
+            )
+        except Exception as e:
+            stderr_file.close()
+            _logger.exception("Error executing command")
+            raise UserError(_(f'Error executing command: {str(e)}'))
+        
+        # Same wall-clock limit as _run_command
+        killer = threading.Timer(300, proc.kill)
+        killer.start()
+        try:
+            for line in proc.stdout:
+                yield line.rstrip('\n')
+            returncode = proc.wait()
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode('utf-8', 'replace')
+        finally:
+            killer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+            proc.stdout.close()
+            stderr_file.close()
+        
+        if returncode != 0:
+            if returncode == -signal.SIGKILL:
+                raise UserError(_('Command timeout expired. The operation took too long.'))
+            error_msg = f"Command failed: {shlex.join(argv)}\nError: {stderr}"
+            _logger.error(error_msg)
+            raise UserError(error_msg)
+
+    def _fetch_git_refs(self, url):
+        """Fetch tags and branches for a URL
+
+        Does not touch the ORM so it can safely run in worker threads.
+        Results are cached per URL for a short time to skip repeated
+        network round-trips.
+        """
+        cached = _REFS_CACHE.get(url)
+        if cached and time.monotonic() - cached[0] < _REFS_CACHE_TTL:
+            return list(cached[1])
+        
+        try:
+            tags = []
+            branches = []
             
-            # Get branches (heads)
-            try:
-                command = f"git ls-remote --heads {self.url}"
-                output = self._run_command(command)
-                
-                if output:
-                    for line in output.split('\n'):
-                        if line and 'refs/heads/' in line:
-                            branch = line.split('refs/heads/')[-1]
-                            refs.append(('branch', branch))
-            except Exception as e:
-                _logger.warning(f"Could not fetch branches: {e}")
+            for ref in self._list_remote_refs(url):
+                if ref.startswith('refs/tags/'):
+                    tag = ref[10:]
+                    # Skip ^{} peeled entries of annotated tags (dulwich lists them)
+                    if not tag.endswith('^{}'):
+                        tags.append(tag)
+                elif ref.startswith('refs/heads/'):
+                    branches.append(ref[11:])
             
-            # Sort: tags first, then branches, both alphabetically
-            refs.sort(key=lambda x: (x[0] != 'tag', x[1]), reverse=True)
+            # Sort once, each list on its own: tags first, then branches,
+            # newest version first
+            tags.sort(key=_natural_sort_key, reverse=True)
+            branches.sort(key=_natural_sort_key, reverse=True)
+            refs = [('tag', tag) for tag in tags] + [('branch', branch) for branch in branches]
             
+            _REFS_CACHE[url] = (time.monotonic(), list(refs))
             return refs
         except Exception as e:
             _logger.exception("Error fetching git references")
             raise UserError(_(f'Error fetching tags/branches: {str(e)}'))
 
-    def action_validate_repository(self):
-        """Validate repository connection and fetch tags/branches"""
+    def _list_remote_refs(self, url):
+        """Yield the ref names advertised by a remote repository
+
+        Uses dulwich in-process when it is installed, which avoids spawning
+        git at all, and falls back to streaming `git ls-remote` otherwise.
+        """
+        if get_transport_and_path is not None:
+            try:
+                remote_refs = _dulwich_get_refs(url, _DULWICH_TIMEOUT)
+            except Exception as e:
+                _logger.warning(f"dulwich could not list refs for {url}, falling back to git: {e}")
+            else:
+                for ref in remote_refs:
+                    yield ref.decode('utf-8', 'replace') if isinstance(ref, bytes) else ref
+                return
+        
+        if not _git_executable():
+            raise UserError(_('Git command not found. Please install git on the server.'))
+        
+        # Get tags and branches in a single round-trip; --refs drops
+        # peeled annotated tag entries server-side
+        # Parse while git is still sending, without buffering the output
+        for line in self._run_command_lines(["git", "ls-remote", "--tags", "--heads", "--refs", url]):
+            # "<sha>\t<ref>": lines without a tab yield an empty ref
+            yield line.partition('\t')[2]
+
+    def _store_git_refs(self, refs, refs_digest=False):
+        """Replace version records with the fetched refs and mark as validated
+
+        refs_digest is stored along with the versions, see _refs_digest.
+        Returns a (tags_count, branches_count) tuple.
+        """
         self.ensure_one()
         
-        try:
-            # Check if git is installed
-            self._run_command("git --version")
-            
-            # Fetch tags and branches
-            refs = self._get_git_refs()
-            
-            if not refs:
-                raise UserError(_('No tags or branches found in repository. Please ensure the repository has at least one tag or branch.'))
-            
-            # Clear existing versions
+        if not refs:
+            raise UserError(_('No tags or branches found in repository. Please ensure the repository has at least one tag or branch.'))
+        
+        # Build version values, legacy storage and counters in a single pass
+        vals_list = []
+        refs_formatted = []
+        tags_count = branches_count = 0
+        for sequence, (ref_type, ref_name) in enumerate(refs):
+            # Tags get lower sequence (show first)
+            if ref_type == 'tag':
+                tags_count += 1
+            else:
+                sequence += 1000
+                branches_count += 1
+            vals_list.append({
+                'name': ref_name,
+                'repository_id': self.id,
+                'version_type': ref_type,
+                'sequence': sequence,
+            })
+            refs_formatted.append(f"{ref_type}:{ref_name}")
+        
+        # Replace versions atomically: a failure leaves the previous sync intact
+        # and the transaction usable (batch validation continues with the rest)
+        with self.env.cr.savepoint():
             self.version_ids.unlink()
-            
-            # Create version records
-            sequence = 0
-            for ref_type, ref_name in refs:
-                # Tags get lower sequence (show first)
-                if ref_type == 'tag':
-                    seq = sequence
-                    sequence += 1
-                else:
-                    seq = 1000 + sequence
-                    sequence += 1
-                
-                self.env['git.repository.version'].create({
-                    'name': ref_name,
-                    'repository_id': self.id,
-                    'version_type': ref_type,
-                    'sequence': seq,
-                })
-            
-            # Format for legacy storage
-            refs_formatted = [f"{ref_type}:{ref_name}" for ref_type, ref_name in refs]
-            
-            tags_count = sum(1 for rt, _ in refs if rt == 'tag')
-            branches_count = sum(1 for rt, _ in refs if rt == 'branch')
-            
+            self.env['git.repository.version'].create(vals_list)
             self.write({
-                'tags': '\n'.join(refs_formatted),
+                'tags': refs_formatted,
+                'refs_digest': refs_digest,
                 'last_sync': fields.Datetime.now(),
                 'state': 'validated',
                 'error_message': False,
             })
+        
+        return tags_count, branches_count
+
+    def _is_unchanged(self, refs_digest):
+        """Whether the stored versions already match a listing with this digest"""
+        self.ensure_one()
+        return bool(self.state == 'validated' and self.version_ids and self.refs_digest == refs_digest)
+
+    def action_validate_repository(self, force=False):
+        """Validate repository connection and fetch tags/branches
+
+        Unless force is set, an already validated repository whose tags and
+        branches did not change since the last sync keeps its stored versions.
+        """
+        if len(self) > 1:
+            return self.action_validate_repositories_batch()
+        self.ensure_one()
+        
+        try:
+            # Fetch tags and branches
+            refs = self._fetch_git_refs(self.url)
+            refs_digest = _refs_digest(refs)
+            if not force and self._is_unchanged(refs_digest):
+                self.write({'last_sync': fields.Datetime.now()})
+                return {
+                    'type': 'ir.actions.client',
+                    'tag': 'display_notification',
+                    'params': {
+                        'message': _('Repository unchanged since last sync.'),
+                        'type': 'success',
+                        'sticky': False,
+                    }
+                }
+            
+            tags_count, branches_count = self._store_git_refs(refs, refs_digest)
             
             message = _('Repository validated successfully.')
             if tags_count > 0:
@@ -228,9 +568,77 @@ class GitRepository(models.Model):
             })
             raise
 
+    def action_validate_repositories_batch(self):
+        """Validate several repositories, fetching their refs concurrently
+
+        Only the ls-remote calls run in worker threads; all ORM writes
+        happen afterwards on the request cursor.
+        """
+        if not self:
+            return True
+        
+        jobs = int(self.env['ir.config_parameter'].sudo().get_param('git_installer.parallel_jobs', 8))
+        urls = {record.id: record.url for record in self}
+        # en_US keeps _() from looking up res.lang on the shared cursor
+        fetcher = self.with_context(lang='en_US')
+        results = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(urls)))) as executor:
+            futures = {
+                executor.submit(fetcher._fetch_git_refs, url): record_id
+                for record_id, url in urls.items()
+            }
+            for future in as_completed(futures):
+                record_id = futures[future]
+                try:
+                    results[record_id] = future.result()
+                except Exception as e:
+                    errors[record_id] = str(e)
+        
+        for record in self:
+            if record.id in errors:
+                record.write({
+                    'state': 'error',
+                    'error_message': errors[record.id],
+                })
+                continue
+            refs = results[record.id]
+            refs_digest = _refs_digest(refs)
+            if record._is_unchanged(refs_digest):
+                record.write({'last_sync': fields.Datetime.now()})
+                continue
+            try:
+                record._store_git_refs(refs, refs_digest)
+            except Exception as e:
+                errors[record.id] = str(e)
+                record.write({
+                    'state': 'error',
+                    'error_message': str(e),
+                })
+        
+        validated_count = len(self) - len(errors)
+        message = _('%s repositories validated.') % validated_count
+        if errors:
+            message += _(' %s failed, see their error details.') % len(errors)
+        
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': message,
+                'type': 'warning' if errors else 'success',
+                'sticky': bool(errors),
+            }
+        }
+
     def action_refresh_tags(self):
-        """Refresh available tags/branches from repository"""
-        return self.action_validate_repository()
+        """Refresh available tags/branches from repository
+
+        Always lists the remote again and rewrites the stored versions.
+        """
+        for record in self:
+            _REFS_CACHE.pop(record.url, None)
+        return self.action_validate_repository(force=True)
 
     def action_clone_tag(self):
         """Open wizard to select and clone a specific tag/branch"""
@@ -254,12 +662,10 @@ class GitRepository(models.Model):
             }
         }
 
-    def _clone_repository_tag(self, ref_full, module_name=None):
-        """Clone specific tag/branch from repository
-        
-        Args:
-            ref_full: Full reference like "tag:18.0.1.0.0" or "branch:18.0"
-            module_name: Optional custom module name
+    def _prepare_clone(self, ref_full, module_name=None):
+        """Parse a reference and claim its target directory
+
+        Returns a (module_name, ref_type, ref_name, target_dir) tuple.
         """
         self.ensure_one()
         
@@ -272,12 +678,10 @@ class GitRepository(models.Model):
             ref_name = ref_full
         
         # Ensure clone path exists
-        if not os.path.exists(self.clone_path):
-            try:
-                os.makedirs(self.clone_path, exist_ok=True)
-                _logger.info(f"Created clone path: {self.clone_path}")
-            except Exception as e:
-                raise UserError(_(f'Cannot create clone path: {str(e)}'))
+        try:
+            os.makedirs(self.clone_path, exist_ok=True)
+        except Exception as e:
+            raise UserError(_(f'Cannot create clone path: {str(e)}'))
         
         # Determine module name from URL if not provided
         if not module_name:
@@ -288,33 +692,77 @@ class GitRepository(models.Model):
         # Add ref suffix to avoid conflicts
         target_dir = os.path.join(self.clone_path, f"{module_name}_{ref_name.replace('/', '_')}")
         
-        # Check if already exists
-        if os.path.exists(target_dir):
+        # Create the (empty) target directory; fails atomically if it already exists
+        try:
+            os.mkdir(target_dir)
+        except FileExistsError:
             raise UserError(_(f'Module directory already exists: {target_dir}\nPlease remove it first or choose a different version.'))
+        except Exception as e:
+            raise UserError(_(f'Cannot create module directory: {str(e)}'))
         
-        temp_dir = None
+        return module_name, ref_type, ref_name, target_dir
+
+    def _clone_into(self, url, ref_type, ref_name, target_dir, addon_names=None):
+        """Clone a tag/branch into an already created target directory
+
+        Does not touch the ORM so it can safely run in worker threads.
+        The target directory is removed if anything fails.
+        """
         try:
-            # Create temporary directory for cloning
-            temp_dir = f"/tmp/odoo_git_clone_{os.getpid()}"
-            
-            # Clone with specific tag/branch
-            _logger.info(f"Cloning repository {self.url} {ref_type} {ref_name} to {temp_dir}")
-            clone_cmd = f"git clone --depth 1 --branch {ref_name} {self.url} {temp_dir}"
-            self._run_command(clone_cmd)
-            
-            # Move to final destination
-            shutil.move(temp_dir, target_dir)
-            temp_dir = None
+            # Clone with specific tag/branch straight into the target directory
+            _logger.info(f"Cloning repository {url} {ref_type} {ref_name} to {target_dir}")
+            if addon_names:
+                # Partial clone: blobs are fetched on checkout, only for the
+                # selected addon folders
+                self._run_command_stream([
+                    "git", "clone", "--progress", "--depth", "1", "--single-branch", "--no-tags",
+                    "--filter=blob:none", "--no-checkout",
+                    "--branch", ref_name, url, target_dir,
+                ])
+                self._run_command(["git", "sparse-checkout", "set", "--cone", "--"] + list(addon_names), cwd=target_dir)
+                self._run_command_stream(["git", "checkout", "--progress", ref_name], cwd=target_dir)
+            else:
+                self._run_command_stream([
+                    "git", "clone", "--progress", "--depth", "1", "--single-branch", "--no-tags",
+                    "--branch", ref_name, url, target_dir,
+                ])
             
             # Set proper permissions
             odoo_user = self._get_odoo_user()
             if odoo_user:
                 try:
-                    _logger.info(f"Setting ownership to {odoo_user} for {target_dir}")
-                    self._run_command(f"chown -R {odoo_user}:{odoo_user} {target_dir}")
+                    uid, gid = _get_user_ids(odoo_user)
+                    # The clone is written by this process, so ownership usually
+                    # already matches (e.g. containerized Odoo): skip the walk
+                    st = os.stat(target_dir)
+                    if (st.st_uid, st.st_gid) != (uid, gid):
+                        _logger.info(f"Setting ownership to {odoo_user} for {target_dir}")
+                        os.chown(target_dir, uid, gid)
+                        for root, dirs, files in os.walk(target_dir):
+                            for name in dirs + files:
+                                os.lchown(os.path.join(root, name), uid, gid)
                 except Exception as e:
                     _logger.warning(f"Could not set ownership: {e}")
-            
+        except Exception:
+            # Cleanup on error
+            _remove_tree(target_dir)
+            raise
+
+    def _clone_repository_tag(self, ref_full, module_name=None, addon_names=None):
+        """Clone specific tag/branch from repository
+        
+        Args:
+            ref_full: Full reference like "tag:18.0.1.0.0" or "branch:18.0"
+            module_name: Optional custom module name
+            addon_names: Optional list of addon folders to check out; when set,
+                a partial sparse clone only downloads those folders' files
+        """
+        self.ensure_one()
+        
+        module_name, ref_type, ref_name, target_dir = self._prepare_clone(ref_full, module_name)
+        self._clone_into(self.url, ref_type, ref_name, target_dir, addon_names)
+        
+        try:
             # Record installed module
             self.env['git.installed.module'].create({
                 'repository_id': self.id,
@@ -323,16 +771,71 @@ class GitRepository(models.Model):
                 'path': target_dir,
                 'install_date': fields.Datetime.now(),
             })
-            
-            return target_dir
-            
-        except Exception as e:
-            # Cleanup on error
-            if temp_dir and os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir, ignore_errors=True)
-            if os.path.exists(target_dir):
-                shutil.rmtree(target_dir, ignore_errors=True)
+        except Exception:
+            _remove_tree(target_dir)
+            raise
+        
+        return target_dir
+
+    def _clone_repository_tags(self, refs_full, module_name=None, addon_names=None):
+        """Clone several tags/branches of the repository concurrently
+
+        Target directories are claimed and installed module records created
+        on the request thread; only the git clones run in worker threads.
+        If any clone fails, pending ones are cancelled, every directory from
+        this batch is removed and the first error is raised.
+
+        Returns the list of target directories, in the order of refs_full.
+        """
+        self.ensure_one()
+        
+        prepared = []
+        try:
+            for ref_full in refs_full:
+                prepared.append(self._prepare_clone(ref_full, module_name))
+        except Exception:
+            for _module, _type, _name, target_dir in prepared:
+                _remove_tree(target_dir)
+            raise
+        
+        if not prepared:
+            return []
+        
+        jobs = int(self.env['ir.config_parameter'].sudo().get_param('git_installer.clone_jobs', 4))
+        # en_US keeps _() from looking up res.lang on the shared cursor
+        cloner = self.with_context(lang='en_US')
+        url = self.url
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(prepared)))) as executor:
+            futures = [
+                executor.submit(cloner._clone_into, url, ref_type, ref_name, target_dir, addon_names)
+                for _module, ref_type, ref_name, target_dir in prepared
+            ]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                for _module, _type, _name, target_dir in prepared:
+                    _remove_tree(target_dir)
+                raise
+        
+        now = fields.Datetime.now()
+        try:
+            self.env['git.installed.module'].create([{
+                'repository_id': self.id,
+                'name': name,
+                'tag': ref_name,
+                'path': target_dir,
+                'install_date': now,
+            } for name, _type, ref_name, target_dir in prepared])
+        except Exception:
+            for _module, _type, _name, target_dir in prepared:
+                _remove_tree(target_dir)
             raise
+        
+        return [target_dir for _module, _type, _name, target_dir in prepared]
 
     def _update_module_list(self):
         """Update Odoo module list - safe method that doesn't commit"""
@@ -352,16 +855,11 @@ class GitRepository(models.Model):
         try:
             # Update module list
             self.env['ir.module.module'].update_list()
-            self.env.cr.commit()
             
-            # Now it's safe to restart
+            # Restart only once the framework has committed the updated list;
+            # defer the signal so the worker can return its response first
             _logger.info("Restarting Odoo server via scheduled action...")
-            try:
-                # Use SIGHUP for graceful reload
-                import signal
-                os.kill(os.getppid(), signal.SIGHUP)
-            except Exception as e:
-                _logger.warning(f"Could not restart Odoo: {e}")
+            self.env.cr.postcommit.add(_schedule_restart)
                 
         except Exception as e:
             _logger.exception("Error in scheduled restart")
@@ -394,8 +892,20 @@ class GitInstalledModule(models.Model):
             }
         
         try:
-            shutil.rmtree(self.path)
-            self.unlink()
+            # Renaming is atomic and instant; the actual deletion runs in the
+            # background once the transaction is committed, so the request
+            # does not wait on the recursive unlink
+            path = self.path
+            trash = f"{path}.trash-{os.getpid()}-{int(time.time())}"
+            os.rename(path, trash)
+            try:
+                self.unlink()
+            except Exception:
+                _restore_tree(trash, path)
+                raise
+            # If the transaction rolls back the record comes back, so must the directory
+            self.env.cr.postrollback.add(functools.partial(_restore_tree, trash, path))
+            self.env.cr.postcommit.add(functools.partial(_remove_tree_in_background, trash))
             
             return {
                 'type': 'ir.actions.client',
@@ -420,7 +930,18 @@ class GitCloneWizard(models.TransientModel):
         required=True,
         domain="[('repository_id', '=', repository_id)]"
     )
+    additional_version_ids = fields.Many2many(
+        'git.repository.version',
+        string='Also Clone',
+        domain="[('repository_id', '=', repository_id), ('id', '!=', version_id)]",
+        help='Other versions to clone at the same time; clones run in parallel'
+    )
     module_name = fields.Char(string='Module Name (optional)', help='Leave empty to use repository name')
+    addon_names = fields.Char(
+        string='Only These Addons (optional)',
+        help='Comma-separated addon folders to download (e.g. web_responsive, web_timeline). '
+             'Leave empty to download the whole repository'
+    )
     auto_update_list = fields.Boolean(
         string='Auto Update Module List', 
         default=True,
@@ -451,12 +972,23 @@ class GitCloneWizard(models.TransientModel):
         if not self.version_id:
             raise UserError(_('Please select a version to clone.'))
         
+        addon_names = [name.strip() for name in (self.addon_names or '').split(',') if name.strip()]
+        for name in addon_names:
+            if name.startswith('-') or '..' in name:
+                raise UserError(_('Invalid addon folder name: %s') % name)
+        
         try:
             # Get full reference from version
             ref_to_clone = self.version_id.full_reference
             
             # Clone repository (this is safe - no commits involved)
-            target_dir = self.repository_id._clone_repository_tag(ref_to_clone, self.module_name)
+            extra_versions = self.additional_version_ids - self.version_id
+            if extra_versions:
+                refs_to_clone = [ref_to_clone] + extra_versions.mapped('full_reference')
+                target_dirs = self.repository_id._clone_repository_tags(refs_to_clone, self.module_name, addon_names)
+                target_dir = ', '.join(target_dirs)
+            else:
+                target_dir = self.repository_id._clone_repository_tag(ref_to_clone, self.module_name, addon_names)
             
             # Update module list if requested (safe - no manual commit)
             if self.auto_update_list:
@@ -2,6 +2,8 @@
 
 from odoo import models, fields, api
 
+ICONS = {'tag': '🏷️', 'branch': '🌿'}
+
 
 class GitRepositoryVersion(models.Model):
     _name = 'git.repository.version'
@@ -9,33 +11,24 @@ class GitRepositoryVersion(models.Model):
     _order = 'sequence, name desc'
 
     name = fields.Char(string='Version/Tag/Branch', required=True)
-    display_name_full = fields.Char(string='Display Name', compute='_compute_display_name_full', store=True)
+    display_name_full = fields.Char(string='Display Name', compute='_compute_derived', store=True, precompute=True)
     repository_id = fields.Many2one('git.repository', string='Repository', required=True, ondelete='cascade')
     version_type = fields.Selection([
         ('tag', 'Tag'),
         ('branch', 'Branch')
     ], string='Type', default='tag', required=True)
     sequence = fields.Integer(string='Sequence', default=10, help='Order of display (tags first by default)')
-    full_reference = fields.Char(string='Full Reference', compute='_compute_full_reference', store=True)
-
-    @api.depends('version_type', 'name')
-    def _compute_display_name_full(self):
-        """Compute display name with icon"""
-        for record in self:
-            icon = '🏷️' if record.version_type == 'tag' else '🌿'
-            record.display_name_full = f"{icon} {record.name}"
+    full_reference = fields.Char(string='Full Reference', compute='_compute_derived', store=True, precompute=True)
 
     @api.depends('version_type', 'name')
-    def _compute_full_reference(self):
-        """Compute full reference like 'tag:18.0.1.0.0' or 'branch:18.0'"""
+    def _compute_derived(self):
+        """Compute display name with icon and full reference like 'tag:18.0.1.0.0' or 'branch:18.0'"""
         for record in self:
+            record.display_name_full = f"{ICONS.get(record.version_type, '')} {record.name}"
             record.full_reference = f"{record.version_type}:{record.name}"
 
-    def name_get(self):
-        """Override name_get to show icon in dropdown"""
-        result = []
+    @api.depends('display_name_full')
+    def _compute_display_name(self):
+        """Show the icon in dropdowns"""
         for record in self:
-            icon = '🏷️' if record.version_type == 'tag' else '🌿'
-            name = f"{icon} {record.name}"
-            result.append((record.id, name))
-        return result
+            record.display_name = record.display_name_full